@@ -11,16 +11,22 @@ Safety features:
 - Runs in dry-run mode by default
 """
 
+import hashlib
 import json
+import re
+import msgspec
 import requests
 import sys
 import os
 import time
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     from dotenv import load_dotenv
@@ -28,55 +34,199 @@ try:
 except ImportError:
     logging.info("Warning: python-dotenv not installed. Using environment variables only.")
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class ExifInfo(msgspec.Struct):
+    """The subset of an asset's EXIF info used by this script"""
+    fileSizeInByte: Optional[int] = None
+
+
+class Asset(msgspec.Struct):
+    """The subset of an Immich asset used by this script"""
+    id: str
+    originalPath: str = ""
+    originalFileName: str = ""
+    exifInfo: Optional[ExifInfo] = None
+
+
+class DuplicateGroup(msgspec.Struct):
+    """A group of assets that Immich detected as duplicates of each other"""
+    assets: List[Asset] = []
+
+
+# Decodes the duplicates JSON straight into the structs above, skipping all other fields
+_duplicates_decoder = msgspec.json.Decoder(List[DuplicateGroup])
+
+
+def _is_compressed(filename: str) -> bool:
+    """Check if a duplicates file is stored zstd-compressed (requires zstandard)"""
+    return filename.endswith('.zst')
+
+
+def _decode_duplicates(data: bytes, filename: str) -> List[DuplicateGroup]:
+    """Decode the contents of a duplicates file, decompressing them first if needed"""
+    if _is_compressed(filename):
+        try:
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        except zstandard.ZstdError as e:
+            # Surface corrupt files like invalid JSON, so callers handle both the same way
+            raise ValueError(f"Invalid zstd data: {e}") from e
+    return _duplicates_decoder.decode(data)
+
+
+def _file_sha256(path: str) -> str:
+    """Compute the SHA-256 hex digest of a file"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
 
 class ImmichAPI:
     def __init__(self, base_url: str, api_key: str, cache_file: str = "duplicates.json"):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.cache_file = cache_file
+        self.cache_meta_file = f"{cache_file}.meta"
+        # Content-Type is only added to requests that actually send a JSON body
         self.headers = {
-            'X-API-Key': api_key,
-            'Content-Type': 'application/json'
+            'X-API-Key': api_key
         }
+        
+        # Reuse connections across requests and retry transient gateway errors. Read
+        # timeouts are not retried, as that would re-run the slow duplicates query
+        retries = Retry(total=3, read=False, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_maxsize=16, max_retries=retries)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
-    def _is_cache_valid(self, max_age_hours: int = 24) -> bool:
-        """Check if cache file exists and is not older than max_age_hours"""
-        if not os.path.exists(self.cache_file):
-            return False
+    def _load_cache_meta(self) -> Optional[Dict[str, Any]]:
+        """Load the cache metadata (fetch time, ETag, size, mtime and hash of the cache file)"""
+        try:
+            with open(self.cache_meta_file, 'rb') as f:
+                meta = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(meta, dict) or not {'fetched_at', 'size', 'mtime_ns', 'sha256'} <= meta.keys():
+            return None
+        return meta
+
+    def _save_cache_meta(self, meta: Dict[str, Any]) -> None:
+        """Save the cache metadata next to the cache file"""
+        try:
+            with open(self.cache_meta_file, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            logging.info(f"Warning: Failed to save cache metadata: {e}")
+
+    def _get_cache_meta(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the cache metadata if the cache file is unchanged since it was fetched, else None.
+        This stats (and at worst hashes) the cache file, so callers should reuse the result.
+        """
+        meta = self._load_cache_meta()
+        if meta is None or not self._cache_matches_meta(meta):
+            return None
+        return meta
+
+    def _is_cache_valid(self, meta: Dict[str, Any], max_age_hours: int = 24) -> bool:
+        """
+        Check if the cache described by meta was fetched less than max_age_hours ago.
         
-        cache_stat = os.stat(self.cache_file)
-        cache_age = datetime.now() - datetime.fromtimestamp(cache_stat.st_mtime)
+        The age comes from the recorded fetch time rather than the file mtime, so
+        touching or restoring the cache file does not make stale data look fresh.
+        """
+        cache_age = datetime.now() - datetime.fromtimestamp(meta['fetched_at'])
         return cache_age < timedelta(hours=max_age_hours)
 
-    def _save_cache(self, data: List[Dict[str, Any]]) -> None:
-        """Save duplicates data to cache file"""
+    def _cache_matches_meta(self, meta: Dict[str, Any]) -> bool:
+        """Check if the cache file is still the one described by the cache metadata"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=None, separators=(',', ':'))
-            logging.info(f"✅ Cached duplicates data to {self.cache_file}")
-        except Exception as e:
-            logging.info(f"Warning: Failed to save cache: {e}")
+            cache_stat = os.stat(self.cache_file)
+        except OSError:
+            return False
+        
+        # Cheap checks first: a different size means different content, and an
+        # unchanged size and mtime means the file was not touched since the fetch
+        if cache_stat.st_size != meta['size']:
+            return False
+        if cache_stat.st_mtime_ns == meta['mtime_ns']:
+            return True
+        
+        # The file was touched, only re-hash it in that case
+        if _file_sha256(self.cache_file) != meta['sha256']:
+            return False
+        
+        # Remember the new mtime so the next check can skip hashing again
+        meta['mtime_ns'] = cache_stat.st_mtime_ns
+        self._save_cache_meta(meta)
+        return True
+
+    def _download_to_cache(self, response: requests.Response) -> List[DuplicateGroup]:
+        """Stream a duplicates response body into the cache file and parse it from there"""
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                writer = f
+                if _is_compressed(self.cache_file):
+                    # The repeated JSON keys compress very well, usually by about 10x
+                    writer = zstandard.ZstdCompressor(level=3).stream_writer(f, closefd=False)
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    writer.write(chunk)
+                if writer is not f:
+                    writer.close()
+            with open(tmp_file, 'rb') as f:
+                file_data = f.read()
+            data = _decode_duplicates(file_data, self.cache_file)
+            # Only replace the previous cache once the new data parsed successfully
+            os.replace(tmp_file, self.cache_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        
+        cache_stat = os.stat(self.cache_file)
+        self._save_cache_meta({
+            'fetched_at': time.time(),
+            'size': cache_stat.st_size,
+            'mtime_ns': cache_stat.st_mtime_ns,
+            'sha256': hashlib.sha256(file_data).hexdigest(),
+            'etag': response.headers.get('ETag'),
+        })
+        logging.info(f"✅ Cached duplicates data to {self.cache_file}")
+        return data
 
-    def _load_cache(self) -> List[Dict[str, Any]]:
+    def _load_cache(self) -> List[DuplicateGroup]:
         """Load duplicates data from cache file"""
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.cache_file, 'rb') as f:
+                return _decode_duplicates(f.read(), self.cache_file)
         except Exception as e:
             logging.info(f"Warning: Failed to load cache: {e}")
             return []
 
-    def get_asset_duplicates(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+    def get_asset_duplicates(self, force_refresh: bool = False) -> List[DuplicateGroup]:
         """
         Fetch duplicate assets from Immich API with caching
         
         Args:
             force_refresh: If True, bypass cache and fetch fresh data
         """
+        # Check the cache file against its metadata only once, both the freshness
+        # check and the ETag revalidation below rely on it
+        cache_meta = self._get_cache_meta()
+        
         # Check if we can use cached data
-        if not force_refresh and self._is_cache_valid():
-            cache_stat = os.stat(self.cache_file)
-            cache_time = datetime.fromtimestamp(cache_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        if not force_refresh and cache_meta is not None and self._is_cache_valid(cache_meta):
+            cache_time = datetime.fromtimestamp(cache_meta['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')
             logging.info(f"📁 Using cached duplicates data from {cache_time}")
             return self._load_cache()
         
@@ -84,21 +234,29 @@ class ImmichAPI:
         logging.info("🔄 Fetching duplicates from Immich API...")
         url = f"{self.base_url}/api/duplicates"
         
+        # Let the server answer 304 Not Modified if the cached data is still current
+        request_headers = {}
+        if cache_meta is not None and cache_meta.get('etag'):
+            request_headers['If-None-Match'] = cache_meta['etag']
+        
         try:
-            response = requests.get(url, headers=self.headers, timeout=300)  # 5 min timeout
-            
-            if response.status_code == 200:
-                data = response.json()
-                self._save_cache(data)
-                return data
-            else:
-                logging.info(f"Error fetching duplicates: {response.status_code} - {response.text}")
-                
-                # Fall back to cache if API fails and cache exists
-                if os.path.exists(self.cache_file):
-                    logging.info(f"⚠️ API failed, falling back to cached data")
+            # Stream the (potentially huge) body to disk instead of buffering it in memory
+            with self.session.get(url, headers=request_headers, stream=True, timeout=300) as response:  # 5 min timeout
+                if response.status_code == 304 and request_headers:
+                    logging.info("📁 Duplicates unchanged on server, using cached data")
+                    cache_meta['fetched_at'] = time.time()
+                    self._save_cache_meta(cache_meta)
                     return self._load_cache()
-                return []
+                if response.status_code == 200:
+                    return self._download_to_cache(response)
+                
+                logging.info(f"Error fetching duplicates: {response.status_code} - {response.text}")
+            
+            # Fall back to cache if API fails and cache exists
+            if os.path.exists(self.cache_file):
+                logging.info(f"⚠️ API failed, falling back to cached data")
+                return self._load_cache()
+            return []
                 
         except requests.exceptions.Timeout:
             logging.info("⏱️ API request timed out (5 minutes)")
@@ -106,76 +264,137 @@ class ImmichAPI:
                 logging.info(f"⚠️ Falling back to cached data")
                 return self._load_cache()
             return []
-        except requests.exceptions.RequestException as e:
-            logging.info(f"❌ Network error: {e}")
+        except (requests.exceptions.RequestException, ValueError, OSError) as e:
+            logging.info(f"❌ Failed to fetch duplicates: {e}")
             if os.path.exists(self.cache_file):
                 logging.info(f"⚠️ Falling back to cached data")
                 return self._load_cache()
             return []
 
-    def delete_assets(self, asset_ids: List[str]) -> bool:
-        """Delete assets by their IDs"""
-        if not asset_ids:
-            return True
-            
+    def _delete_batch(self, asset_ids: List[str]) -> int:
+        """
+        Delete a single batch of assets in one request, returning how many were deleted.
+        If the server rejects the payload as too large, the batch is split in half.
+        """
         url = f"{self.base_url}/api/assets"
         payload = {"ids": asset_ids}
         
-        response = requests.delete(url, headers=self.headers, json=payload)
+        response = self.session.delete(url, json=payload)
         
         if response.status_code == 204:
-            return True
+            logging.info(f"Successfully deleted {len(asset_ids)} assets")
+            return len(asset_ids)
+        elif response.status_code == 413 and len(asset_ids) > 1:
+            logging.info(f"Batch of {len(asset_ids)} assets is too large for the server, splitting it")
+            half = len(asset_ids) // 2
+            deleted = self._delete_batch(asset_ids[:half])
+            if deleted < half:
+                return deleted
+            return deleted + self._delete_batch(asset_ids[half:])
         else:
             logging.info(f"Error deleting assets: {response.status_code} - {response.text}")
-            return False
+            return 0
+
+    def delete_assets(self, asset_ids: List[str], max_payload_bytes: int = 4_000_000) -> int:
+        """
+        Delete assets by their IDs, returning how many were deleted.
+        
+        The bulk delete endpoint accepts many IDs at once, so the IDs are only split
+        into several (concurrent) requests if the payload would exceed max_payload_bytes.
+        Stops sending further batches after the first failure.
+        """
+        if not asset_ids:
+            return 0
+        
+        # Each ID is serialized as '"<id>", ' in the JSON payload
+        avg_id_bytes = sum(len(asset_id) for asset_id in asset_ids) // len(asset_ids) + 4
+        batch_size = max(1, max_payload_bytes // avg_id_bytes)
+        batches = [asset_ids[i:i + batch_size] for i in range(0, len(asset_ids), batch_size)]
+        total_deleted = 0
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(batches))) as executor:
+            futures = [executor.submit(self._delete_batch, batch) for batch in batches]
+            for batch, future in zip(batches, futures):
+                if future.cancelled():
+                    continue
+                deleted = future.result()
+                total_deleted += deleted
+                if deleted < len(batch):
+                    # Don't start any batches that are still queued
+                    for pending in futures:
+                        pending.cancel()
+        
+        return total_deleted
+
+
+_FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
-    if size_bytes == 0:
+    if size_bytes <= 0:
         return "0 B"
     
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} TB"
+    # Every unit is 2**10 times the previous one, so the bit length picks the unit
+    unit_index = min((size_bytes.bit_length() - 1) // 10, len(_FILE_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit_index * 10)):.1f} {_FILE_SIZE_UNITS[unit_index]}"
+
+
+def get_file_size(asset: Asset) -> int:
+    """Get the file size of an asset in bytes, or 0 if unknown"""
+    exif_info = asset.exifInfo
+    if exif_info is None:
+        return 0
+    return exif_info.fileSizeInByte or 0
+
+
+# Common WhatsApp patterns, matched against lowercased paths and filenames
+_WHATSAPP_INDICATORS = (
+    'whatsapp images',
+    #'wa0',
+    'whatsapp/sent/',
+    'whatsapp/private/',
+    #'img-',
+    #'-wa0'
+)
+
+# A plain substring test for the prefix shared by all indicators rules out most
+# assets cheaply. The regex then matches all indicators in a single pass; the
+# engine factors out the shared prefix and, as long as the pattern is
+# case-sensitive, uses a fast literal search to find candidate positions.
+_WHATSAPP_PREFIX = os.path.commonprefix(_WHATSAPP_INDICATORS)
+_WHATSAPP_PATTERN = re.compile('|'.join(map(re.escape, _WHATSAPP_INDICATORS)))
 
 
-def is_whatsapp_asset(asset: Dict[str, Any]) -> bool:
+def is_whatsapp_asset(asset: Asset) -> bool:
     """Check if an asset is from WhatsApp based on path or filename"""
-    original_path = asset.get('originalPath', '').lower()
-    original_filename = asset.get('originalFileName', '').lower()
+    # Check the path first, where WhatsApp folders usually show up, and only search
+    # with the regex if the (much cheaper) prefix substring test passes
+    original_path = asset.originalPath.lower()
+    if _WHATSAPP_PREFIX in original_path and _WHATSAPP_PATTERN.search(original_path):
+        return True
     
-    # Check for common WhatsApp patterns
-    whatsapp_indicators = [
-        'whatsapp images',
-        #'wa0',
-        'whatsapp/sent/',
-        'whatsapp/private/',
-        #'img-',
-        #'-wa0'
-    ]
-    
-    path_and_filename = f"{original_path} {original_filename}".lower()
-    
-    return any(indicator in path_and_filename for indicator in whatsapp_indicators)
+    original_filename = asset.originalFileName.lower()
+    return _WHATSAPP_PREFIX in original_filename and _WHATSAPP_PATTERN.search(original_filename) is not None
 
 
-def find_whatsapp_duplicates_to_delete(duplicates: List[Dict[str, Any]]) -> tuple[List[str], Dict[str, int]]:
+def iter_whatsapp_duplicates(duplicates: List[DuplicateGroup]) -> Iterator[Tuple[str, str, str, int, str, int]]:
     """
-    Identify WhatsApp duplicates to delete.
-    For each duplicate group, if there's a WhatsApp version and a non-WhatsApp version,
-    mark the WhatsApp version for deletion.
+    Yield every WhatsApp asset that is part of a duplicate group, without any logging.
+    The WhatsApp asset should only be deleted if the original is larger (i.e. the
+    WhatsApp version is compressed).
     
-    Returns:
-        Tuple of (asset_ids_to_delete, path_summary)
+    Yields:
+        Tuples of (whatsapp_id, whatsapp_name, whatsapp_path, whatsapp_size,
+        original_name, original_size), where the original is the largest version
+        with a different filename
     """
-    assets_to_delete = []
-    path_summary = {}
+    # Bind globals used once per asset to locals, which are faster to look up
+    is_whatsapp = is_whatsapp_asset
+    file_size = get_file_size
     
     for duplicate_group in duplicates:
-        assets = duplicate_group.get('assets', [])
+        assets = duplicate_group.assets
         if len(assets) < 2:
             continue
             
@@ -183,46 +402,80 @@ def find_whatsapp_duplicates_to_delete(duplicates: List[Dict[str, Any]]) -> tupl
         non_whatsapp_assets = []
         
         for asset in assets:
-            if is_whatsapp_asset(asset):
+            if is_whatsapp(asset):
                 whatsapp_assets.append(asset)
             non_whatsapp_assets.append(asset)
         
-        # Only delete WhatsApp assets if there are non-WhatsApp versions available
-        # AND the WhatsApp version is smaller (compressed)
         if whatsapp_assets and non_whatsapp_assets:
+            # Find the largest original once per group, plus the largest one with a
+            # different filename for WhatsApp copies that share the largest's name
+            largest_asset = max(non_whatsapp_assets, key=file_size)
+            largest_size = file_size(largest_asset)
+            largest_name = largest_asset.originalFileName
+            runner_up_size = 0
+            runner_up_name = ""
+            
+            for orig_asset in non_whatsapp_assets:
+                if orig_asset.originalFileName == largest_name:
+                    continue
+                orig_file_size = file_size(orig_asset)
+                if orig_file_size > runner_up_size:
+                    runner_up_size = orig_file_size
+                    runner_up_name = orig_asset.originalFileName
+            
             for wa_asset in whatsapp_assets:
-                wa_file_size = wa_asset.get('exifInfo', {}).get('fileSizeInByte', 0)
+                wa_name = wa_asset.originalFileName
                 
-                # Check if any non-WhatsApp version is larger
-                has_larger_original = False
-                largest_original_size = 0
-                largest_original_name = ""
-                
-                for orig_asset in non_whatsapp_assets:
-                    if orig_asset['originalFileName'] == wa_asset["originalFileName"]:
-                        continue
-                    orig_file_size = orig_asset.get('exifInfo', {}).get('fileSizeInByte', 0)
-                    if orig_file_size > wa_file_size:
-                        has_larger_original = True
-                        if orig_file_size > largest_original_size:
-                            largest_original_size = orig_file_size
-                            largest_original_name = orig_asset['originalFileName']
-                
-                if has_larger_original:
-                    assets_to_delete.append(wa_asset['id'])
-                    
-                    # Track path for summary
-                    dir_path = os.path.dirname(wa_asset['originalPath'])
-                    path_summary[dir_path] = path_summary.get(dir_path, 0) + 1
-                    
-                    logging.info(f"  📱 WhatsApp duplicate: {wa_asset['originalFileName']}")
-                    logging.info(f"     Path: {wa_asset['originalPath']}")
-                    logging.info(f"     Size: {format_file_size(wa_file_size)} (compressed)")
-                    logging.info(f"     Original: {largest_original_name} ({format_file_size(largest_original_size)})")
-                    logging.info(f"     ID: {wa_asset['id']}")
+                # Compare against the largest version with a different filename
+                if wa_name != largest_name:
+                    original_size, original_name = largest_size, largest_name
                 else:
-                    logging.info(f"  ⚠️  Skipping: {wa_asset['originalFileName']}")
-                    logging.info(f"     Reason: WhatsApp version ({format_file_size(wa_file_size)}) is not smaller than original")
+                    original_size, original_name = runner_up_size, runner_up_name
+                
+                yield wa_asset.id, wa_name, wa_asset.originalPath, file_size(wa_asset), original_name, original_size
+
+
+def find_whatsapp_duplicates_to_delete(duplicates: List[DuplicateGroup]) -> tuple[List[str], Dict[str, int]]:
+    """
+    Identify WhatsApp duplicates to delete.
+    For each duplicate group, if there's a WhatsApp version and a non-WhatsApp version,
+    mark the WhatsApp version for deletion.
+    
+    Returns:
+        Tuple of (asset_ids_to_delete, path_summary)
+    """
+    assets_to_delete = []
+    path_summary = {}
+    # Skip building the per-asset messages entirely if they would be filtered out
+    log_details = logging.getLogger().isEnabledFor(logging.INFO)
+    
+    # Bind methods used once per asset to locals, which are faster to look up
+    assets_to_delete_append = assets_to_delete.append
+    path_summary_get = path_summary.get
+    dirname = os.path.dirname
+    
+    for wa_id, wa_name, wa_path, wa_size, original_name, original_size in iter_whatsapp_duplicates(duplicates):
+        # Only delete WhatsApp assets if the WhatsApp version is smaller (compressed)
+        if original_size > wa_size:
+            assets_to_delete_append(wa_id)
+            
+            # Track path for summary
+            dir_path = dirname(wa_path)
+            path_summary[dir_path] = path_summary_get(dir_path, 0) + 1
+            
+            if log_details:
+                logging.info(
+                    f"  📱 WhatsApp duplicate: {wa_name}\n"
+                    f"     Path: {wa_path}\n"
+                    f"     Size: {format_file_size(wa_size)} (compressed)\n"
+                    f"     Original: {original_name} ({format_file_size(original_size)})\n"
+                    f"     ID: {wa_id}"
+                )
+        elif log_details:
+            logging.info(
+                f"  ⚠️  Skipping: {wa_name}\n"
+                f"     Reason: WhatsApp version ({format_file_size(wa_size)}) is not smaller than original"
+            )
                 
     if assets_to_delete:
         logging.info(f"\n{'='*60}")
@@ -277,15 +530,15 @@ def setup_logging(log_level: str, log_file: str) -> None:
             logging.error(f"Failed to setup file logging: {e}")
 
 
-def load_duplicates_from_file(filename: str) -> List[Dict[str, Any]]:
+def load_duplicates_from_file(filename: str) -> List[DuplicateGroup]:
     """Load duplicates from JSON file"""
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filename, 'rb') as f:
+            return _decode_duplicates(f.read(), filename)
     except FileNotFoundError:
         logging.info(f"Error: File '{filename}' not found")
         return []
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         logging.info(f"Error parsing JSON file: {e}")
         return []
 
@@ -321,6 +574,11 @@ def main():
     logging.info("Immich WhatsApp Duplicate Cleaner")
     logging.info("=" * 40)
     
+    if _is_compressed(DUPLICATES_FILE) and zstandard is None:
+        logging.info("Error: zstandard is required for a compressed DUPLICATES_FILE (.zst).")
+        logging.info("Install it with 'pip install zstandard' or use an uncompressed file.")
+        return
+    
     # Load duplicates data
     if USE_API:
         # Validate required configuration for API usage
@@ -377,20 +635,8 @@ def main():
         # Initialize API for actual deletion
         api = ImmichAPI(IMMICH_BASE_URL, IMMICH_API_KEY)
         
-        # Delete in batches to avoid overwhelming the API
-        batch_size = 500
-        total_deleted = 0
-        
-        for i in range(0, len(assets_to_delete), batch_size):
-            batch = assets_to_delete[i:i + batch_size]
-            logging.info(f"Deleting batch {i//batch_size + 1} ({len(batch)} assets)...")
-            
-            if api.delete_assets(batch):
-                total_deleted += len(batch)
-                logging.info(f"Successfully deleted {len(batch)} assets")
-            else:
-                logging.info(f"Failed to delete batch {i//batch_size + 1}")
-                break
+        logging.info(f"Deleting {len(assets_to_delete)} assets...")
+        total_deleted = api.delete_assets(assets_to_delete)
         
         logging.info(f"Completed: {total_deleted} assets deleted")
 